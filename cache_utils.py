@@ -7,7 +7,7 @@ based on input parameters and modification times of dependent files.
 import hashlib
 import json
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Optional, Union
 import polars as pl
 
 
@@ -15,7 +15,8 @@ class FileCache:
     """
     Simple file-based cache for DataFrames with dependency tracking.
     
-    Caches computation results as parquet files and invalidates based on:
+    Caches computation results as LZ4-compressed Arrow IPC files (cheap to
+    decompress and scannable lazily) and invalidates based on:
     - Changes to input parameters
     - Changes to dependent file modification times
     
@@ -42,7 +43,7 @@ class FileCache:
         Initialize the cache.
         
         Args:
-            cache_dir: Directory to store cached parquet files
+            cache_dir: Directory to store cached Arrow IPC files
         """
         self.cache_dir = cache_dir
         self.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -80,8 +81,8 @@ class FileCache:
         return hasher.hexdigest()[:16]  # Use first 16 chars for shorter filenames
     
     def _get_cache_path(self, cache_hash: str, key: str) -> Path:
-        """Get the path to the cached parquet file."""
-        return self.cache_dir / f"{key}_{cache_hash}.parquet"
+        """Get the path to the cached Arrow IPC file."""
+        return self.cache_dir / f"{key}_{cache_hash}.arrow"
     
     def _get_metadata_path(self, cache_hash: str, key: str) -> Path:
         """Get the path to the cache metadata file."""
@@ -92,9 +93,10 @@ class FileCache:
         key: str,
         params: dict[str, Any],
         dependencies: list[Path],
-        compute_fn: Callable[[], pl.DataFrame],
+        compute_fn: Callable[[], Union[pl.DataFrame, pl.LazyFrame]],
         force_recompute: bool = False,
-    ) -> pl.DataFrame:
+        lazy: bool = False,
+    ) -> Union[pl.DataFrame, pl.LazyFrame]:
         """
         Get cached result or compute if cache is invalid.
         
@@ -102,11 +104,15 @@ class FileCache:
             key: Base key for the computation (e.g., "state_streets")
             params: Dictionary of parameters that affect the computation
             dependencies: List of file paths that the computation depends on
-            compute_fn: Function that computes the result (returns a DataFrame)
+            compute_fn: Function that computes the result (returns a DataFrame, or a
+                LazyFrame to stream straight into the cache file without
+                materializing the result in memory)
             force_recompute: If True, ignore cache and recompute
+            lazy: If True, return a LazyFrame scanning the cached IPC file, so
+                callers keep projection and predicate pushdown on the cached data
             
         Returns:
-            DataFrame with the computation result
+            DataFrame with the computation result (LazyFrame if lazy=True)
         """
         # Compute hash from inputs
         cache_hash = self._compute_hash(key, params, dependencies)
@@ -117,7 +123,12 @@ class FileCache:
         if not force_recompute and cache_path.exists():
             try:
                 # Load cached result
-                df = pl.read_parquet(cache_path)
+                if lazy:
+                    lf = pl.scan_ipc(cache_path)
+                    lf.collect_schema()  # Fail here rather than at collect time if unreadable
+                    print(f"✓ Cache hit: {cache_path.name}")
+                    return lf
+                df = pl.read_ipc(cache_path)
                 print(f"✓ Cache hit: {cache_path.name}")
                 return df
             except Exception as e:
@@ -129,7 +140,12 @@ class FileCache:
         
         # Save to cache
         try:
-            df.write_parquet(cache_path)
+            if isinstance(df, pl.LazyFrame):
+                # Write batches to the cache file as the streaming engine produces them
+                df.sink_ipc(cache_path, compression="lz4", engine="streaming")
+                df = pl.scan_ipc(cache_path)
+            else:
+                df.write_ipc(cache_path, compression="lz4")
             
             # Save metadata for debugging
             metadata = {
@@ -142,10 +158,15 @@ class FileCache:
                 json.dump(metadata, f, indent=2)
             
             print(f"✓ Cached result: {cache_path.name}")
+            
+            if lazy:
+                return pl.scan_ipc(cache_path)
         except Exception as e:
             print(f"⚠ Failed to cache result: {e}")
         
-        return df
+        if lazy:
+            return df.lazy()
+        return df.collect() if isinstance(df, pl.LazyFrame) else df
     
     def clear(self, key: Optional[str] = None):
         """
@@ -164,7 +185,8 @@ class FileCache:
         
         removed_count = 0
         for cache_file in self.cache_dir.glob(pattern):
-            if cache_file.suffix in ['.parquet', '.json']:
+            # .parquet for entries written before the cache switched to IPC
+            if cache_file.suffix in ['.arrow', '.parquet', '.json']:
                 cache_file.unlink()
                 removed_count += 1
         
@@ -184,9 +206,9 @@ class FileCache:
                     metadata = json.load(f)
                     
                 # Add file size and modification time
-                parquet_file = metadata_file.with_suffix('.parquet')
-                if parquet_file.exists():
-                    stat = parquet_file.stat()
+                cache_file = metadata_file.with_suffix('.arrow')
+                if cache_file.exists():
+                    stat = cache_file.stat()
                     metadata['size_mb'] = stat.st_size / (1024 * 1024)
                     metadata['cached_at'] = stat.st_mtime
                     
@@ -276,7 +276,7 @@ def process_osm_to_parquet(pbf_path: Path, state_name: str, output_path: Path =
     print("SUMMARY STATISTICS")
     print("=" * 70)
     print(f"Total unique streets: {len(df):,}")
-    print(f"Streets with multiple segments: {len(df.filter(pl.col('num_segments') > 1)):,}")
+    print(f"Streets with multiple segments: {df.select((pl.col('num_segments') > 1).sum()).item():,}")
     
     # Show most common street names
     print("\nTop 10 street names:")
@@ -2,12 +2,13 @@
 """Analyze what fraction of streets in each state are named after that state."""
 
 import sys
+import re
 from pathlib import Path
 import polars as pl
 
 # Add parent directory to path to import workspace modules
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-from workspace.load_street_df import load_street_df
+from workspace.load_street_df import load_street_df, NUMBERED_STREET_PATTERN
 from workspace.states import USState
 from workspace.explore.state_sts.most_common_state_st import extract_state_names_from_street_name
 
@@ -22,42 +23,57 @@ def analyze_state_naming_fractions():
     print("Loading all streets from all states (excluding numbered streets)...")
     # Exclude numbered streets to match the stacked bar chart analysis
     all_streets_lf = load_street_df()
-    all_streets_lf = all_streets_lf.filter(~pl.col("street_name").str.contains(r"\d", literal=False))
-    
-    # Collect to DataFrame for processing
-    print("Collecting data...")
-    all_streets_df = all_streets_lf.collect()
-    
-    print(f"Total streets loaded: {len(all_streets_df):,}")
+    all_streets_lf = all_streets_lf.filter(
+        ~pl.col("street_name").str.contains(NUMBERED_STREET_PATTERN, literal=False)
+    )
     
     # Get all state names
     all_state_names = USState.all_names()
     
+    # Count streets per state, and how many of them are named after that state,
+    # matching the state name as a whole word like extract_state_names_from_street_name.
+    # Each street is matched only against its own state's pattern (looked up
+    # per row), so every street name is regex-scanned once, and the group_by
+    # just sums the resulting booleans
+    state_name_patterns = {
+        state_name.replace(" ", "-"): r'\b' + re.escape(state_name) + r'\b'
+        for state_name in all_state_names
+    }
+    
+    # Aggregate straight from the scan, which only reads the state and
+    # street_name columns, instead of collecting every street first
+    print("Aggregating street counts...")
+    counts_df = (
+        all_streets_lf
+        .select(
+            "state",
+            pl.col("street_name")
+            .str.to_lowercase()
+            .str.contains(pl.col("state").replace_strict(state_name_patterns, default=None))
+            .alias("is_state_named"),
+        )
+        .group_by("state")
+        .agg(pl.len(), pl.col("is_state_named").sum())
+        .collect()
+    )
+    total_counts = {state: total for state, total, _ in counts_df.iter_rows()}
+    named_counts = {state: named for state, _, named in counts_df.iter_rows()}
+    
+    print(f"Total streets loaded: {sum(total_counts.values()):,}")
+    
     results = []
     
     for state_name in all_state_names:
-        state_lower = state_name.lower()
         # Convert state name to dash format (as stored in the data)
-        state_dash = state_lower.replace(" ", "-")
+        state_dash = state_name.replace(" ", "-")
         
-        # Filter to streets in this state
-        state_streets = all_streets_df.filter(pl.col("state") == state_dash)
-        total_streets = len(state_streets)
+        total_streets = total_counts.get(state_dash, 0)
         
         if total_streets == 0:
             print(f"Warning: No streets found for {state_name}")
             continue
         
-        # Count streets in this state that are named after this state
-        # We'll use a simpler approach: check if the state name appears in the street name
-        # This matches the logic used in extract_state_names_from_street_name
-        import re
-        escaped_name = re.escape(state_name)
-        pattern = r'\b' + escaped_name + r'\b'
-        state_named_streets = state_streets.filter(
-            pl.col("street_name").str.to_lowercase().str.contains(pattern, literal=False)
-        )
-        state_named_count = len(state_named_streets)
+        state_named_count = named_counts.get(state_dash, 0)
         
         fraction = (state_named_count / total_streets * 100) if total_streets > 0 else 0.0
         
@@ -10,6 +10,7 @@ Ranks each state for each metric (1 = best/highest), then averages the ranks.
 Sorts by average rank (lower = more egotistical).
 """
 
+import io
 import sys
 from pathlib import Path
 from typing import Optional
@@ -27,52 +28,67 @@ from workspace.plot_utils import get_output_path_from_script
 from workspace.cache_utils import FileCache
 
 
+# Single-character HTML escapes, applied in one str.translate pass
+_HTML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
+
+
 def escape_html(text):
     """Escape HTML special characters."""
     if not isinstance(text, str):
         text = str(text)
-    text = text.replace('&', '&amp;')
-    text = text.replace('<', '&lt;')
-    text = text.replace('>', '&gt;')
-    text = text.replace('"', '&quot;')
-    text = text.replace("'", '&#x27;')
-    return text
+    return text.translate(_HTML_ESCAPE_TABLE)
 
 
-def generate_html_table(rows, table_class=""):
-    """Generate a simple HTML table from list of dictionaries."""
-    html = []
-    
-    if not rows:
-        return ""
-    
-    # Get column names from first row
-    columns = list(rows[0].keys())
-    
-    # Table element
-    table_classes = f' class="{table_class}"' if table_class else ''
-    html.append(f'<table{table_classes}>')
-    
-    # Header
-    html.append('  <thead>')
-    html.append('    <tr>')
-    for col in columns:
-        html.append(f'      <th>{escape_html(col)}</th>')
-    html.append('    </tr>')
-    html.append('  </thead>')
+def generate_html_table(rows, table_class="", out=None):
+    """
+    Generate a simple HTML table from list of dictionaries.
     
-    # Body
-    html.append('  <tbody>')
-    for row in rows:
-        html.append('    <tr>')
-        for col in columns:
-            html.append(f'      <td>{escape_html(str(row.get(col, "")))}</td>')
-        html.append('    </tr>')
-    html.append('  </tbody>')
+    Args:
+        rows: List of dictionaries, one per table row (keys of the first row are the columns)
+        table_class: Optional CSS class for the table element
+        out: Optional file-like object to stream the table into. If None, the
+            table is built in memory and returned as a string
+        
+    Returns:
+        The HTML table string, or None if it was written to out
+    """
+    sink = io.StringIO() if out is None else out
     
-    html.append('</table>')
+    if rows:
+        # Get column names from first row
+        columns = list(rows[0].keys())
+        
+        # Table element
+        table_classes = f' class="{table_class}"' if table_class else ''
+        sink.write(f'<table{table_classes}>\n')
+        
+        # Header (flat, so the whole block is a single joined write)
+        sink.write(
+            '  <thead>\n    <tr>\n'
+            + ''.join('      <th>' + escape_html(col) + '</th>\n' for col in columns)
+            + '    </tr>\n  </thead>\n'
+        )
+        
+        # Body
+        sink.write('  <tbody>\n')
+        # One joined string per row instead of one write per cell
+        for row in rows:
+            sink.write(
+                '    <tr>\n'
+                + '\n'.join('      <td>' + escape_html(row.get(col, "")) + '</td>' for col in columns)
+                + '\n    </tr>\n'
+            )
+        sink.write('  </tbody>\n')
+        
+        sink.write('</table>')
     
-    return '\n'.join(html)
+    return sink.getvalue() if out is None else None
 
 
 def _compute_combined_metrics() -> pl.DataFrame:
@@ -82,13 +98,15 @@ def _compute_combined_metrics() -> pl.DataFrame:
     Returns:
         DataFrame with combined metrics, sorted by average rank
     """
-    lf = load_state_streets_df()
+    # Materialize the state-named streets once and share them across all
+    # three metrics instead of re-reading them for each one
+    lf = load_state_streets_df().collect().lazy()
     
     print("Calculating in-state percentage...")
     in_state_pct_df = calculate_in_state_percentage(lf)
     
     print("Calculating state fraction of all streets...")
-    state_fraction_df = calculate_state_fraction_of_all_streets()
+    state_fraction_df = calculate_state_fraction_of_all_streets(lf)
     
     print("Calculating self vs other named...")
     self_vs_other_df = calculate_self_vs_other_named(lf)
@@ -208,11 +226,6 @@ def generate_combined_metrics_table(
             "Avg Rank": f"{row['avg_rank']:.1f}"
         })
     
-    html_table = generate_html_table(rows, table_class="combined-metrics-table")
-    
-    # Wrap table in a scrollable container div
-    html_table = f'<div class="table-scroll-wrapper">{html_table}</div>'
-    
     # Determine output path
     if output_path is None:
         output_path = get_output_path_from_script(
@@ -220,10 +233,13 @@ def generate_combined_metrics_table(
             "combined_metrics_table.html"
         )
     
-    # Save HTML table
+    # Save HTML table, streamed straight into the file and wrapped in a
+    # scrollable container div
     output_path.parent.mkdir(parents=True, exist_ok=True)
     with open(output_path, 'w') as f:
-        f.write(html_table)
+        f.write('<div class="table-scroll-wrapper">')
+        generate_html_table(rows, table_class="combined-metrics-table", out=f)
+        f.write('</div>')
     
     print(f"\nHTML table saved to: {output_path}")
     print(f"\nTop 10 states by average rank (lower = more egotistical):")
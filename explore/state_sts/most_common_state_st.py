@@ -4,14 +4,21 @@ Supports both simple (non-stacked) and stacked (in-state vs out-of-state) visual
 
 import sys
 import re
+import functools
 from pathlib import Path
 from typing import Optional, Tuple
 import polars as pl
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 
 # Add parent directory to path to import workspace modules
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-from workspace.load_street_df import load_state_streets_df, load_street_df
+from workspace.load_street_df import (
+    load_state_streets_df,
+    load_street_df,
+    STATE_NAME_PATTERN,
+    STATE_NAME_PRIORITY,
+)
 from workspace.states import USState
 from workspace.plot_utils import (
     create_horizontal_bar_plot,
@@ -20,6 +27,8 @@ from workspace.plot_utils import (
     setup_tufte_style
 )
 
+_STATE_NAME_RE = re.compile(STATE_NAME_PATTERN)
+
 
 def extract_state_names_from_street_name(street_name: str) -> list[str]:
     """
@@ -42,49 +51,63 @@ def extract_state_names_from_street_name(street_name: str) -> list[str]:
     Returns:
         List containing at most one state name (the longest match), or empty list if none found
     """
-    street_lower = street_name.lower()
-    found_states = []
+    longest_state = _longest_state_name(street_name)
+    return [longest_state] if longest_state is not None else []
+
+
+@functools.lru_cache(maxsize=1_000_000)
+def _longest_state_name(street_name: str) -> Optional[str]:
+    """
+    Cached implementation of extract_state_names_from_street_name.
     
-    # Get all state names and separate into multi-word and single-word
-    all_state_names = USState.all_names()
-    multi_word_states = [s for s in all_state_names if ' ' in s]
-    single_word_states = [s for s in all_state_names if ' ' not in s]
-    
-    # Sort multi-word states by length (longest first) to prioritize longer matches
-    multi_word_states.sort(key=len, reverse=True)
-    
-    # Track character positions that have been consumed by multi-word matches
-    # This prevents "Virginia" from matching when it's part of "West Virginia"
-    multi_word_matches = []  # Store (state_name, start_pos, end_pos)
-    
-    # First, find all multi-word state name matches and track their positions
-    for state_name in multi_word_states:
-        escaped_name = re.escape(state_name)
-        pattern = r'\b' + escaped_name + r'\b'
-        for match in re.finditer(pattern, street_lower):
-            found_states.append(state_name)
-            # Track the character positions consumed by this match
-            start, end = match.span()
-            multi_word_matches.append((state_name, start, end))
-    
-    # Then check single-word state names
-    # Only add if the match doesn't overlap with any multi-word match
-    for state_name in single_word_states:
-        escaped_name = re.escape(state_name)
-        pattern = r'\b' + escaped_name + r'\b'
-        for match in re.finditer(pattern, street_lower):
-            start, end = match.span()
-            # Check if this match overlaps with any consumed positions
-            if not any(start < end_pos and end > start_pos 
-                      for _, start_pos, end_pos in multi_word_matches):
-                found_states.append(state_name)
+    Street names repeat heavily across (and within) states, so memoizing on the
+    name means the matching below runs once per unique name rather than per row.
+    Returns an immutable result (the state name or None) so cached values can't be
+    mutated by callers.
+    
+    Args:
+        street_name: The street name to search
+        
+    Returns:
+        The longest state name found, or None if none found
+    """
+    # A single precompiled alternation (longest names first) finds every
+    # non-overlapping state name match in one scan, so "West Virginia Ave"
+    # matches "west virginia" and never the "virginia" inside it
+    found_states = _STATE_NAME_RE.findall(street_name.lower())
     
     # Return only the longest state name found (if any)
     if found_states:
-        longest_state = max(found_states, key=len)
-        return [longest_state]
+        return min(found_states, key=STATE_NAME_PRIORITY.__getitem__)
     else:
-        return []
+        return None
+
+
+def extract_state_name_expr(column: str = "street_name") -> pl.Expr:
+    """
+    Vectorized equivalent of extract_state_names_from_street_name.
+
+    Scans the column once with a single alternation regex over all state names
+    and keeps the longest match, so "West Virginia Ave" yields "west virginia"
+    rather than "virginia".
+
+    Args:
+        column: Name of the street name column
+
+    Returns:
+        polars Expr evaluating to the matched (lowercase) state name, or null if none found
+    """
+    return (
+        pl.col(column)
+        .str.to_lowercase()
+        .str.extract_all(STATE_NAME_PATTERN)
+        .list.eval(
+            pl.element().sort_by(
+                pl.element().replace_strict(STATE_NAME_PRIORITY, return_dtype=pl.UInt32)
+            )
+        )
+        .list.first()
+    )
 
 
 def count_state_names_in_streets(
@@ -113,35 +136,58 @@ def count_state_names_in_streets(
         DataFrame with columns: 'state_name' and 'count', sorted by count descending
     """
     print("Extracting state names from street names...")
-    
-    # Collect to DataFrame for string processing
-    df = lf.collect()
-    
-    # Extract state names for each street
-    state_names_list = []
-    for street_name in df['street_name']:
-        found_states = extract_state_names_from_street_name(street_name)
-        state_names_list.append(found_states)
-    
-    # Add as a new column
-    df = df.with_columns(pl.Series("found_state_names", state_names_list))
-    
-    # Explode the list so each state name gets its own row
-    df_exploded = df.explode("found_state_names")
-    
-    # Group by state name and count occurrences
+
+    # Extract the state name for each street in a single pass over the column
     state_counts = (
-        df_exploded
-        .group_by("found_state_names")
+        lf
+        .select(extract_state_name_expr().alias("state_name"))
+        .drop_nulls("state_name")
+        .group_by("state_name")
         .agg(pl.len().alias("count"))
         .sort("count", descending=True)
         .head(top_n)
-        .rename({"found_state_names": "state_name"})
+        .collect()
     )
     
     return state_counts
 
 
+def _count_state_names_by_location(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Count in-state vs out-of-state occurrences of each state name found in street names.
+    
+    Args:
+        lf: LazyFrame containing state-named streets with 'street_name' and 'state' columns
+        
+    Returns:
+        LazyFrame with columns: 'state_name', 'in_state', 'out_of_state', 'total'
+        sorted by total descending
+    """
+    return (
+        lf
+        .select([
+            extract_state_name_expr().alias("state_name"),
+            # Normalize physical state: convert dashes to spaces and lowercase
+            # (data stores states as "new-york" but state names are "new york")
+            pl.col("state").str.to_lowercase().str.replace_all("-", " ", literal=True)
+            .alias("physical_state"),
+        ])
+        .drop_nulls("state_name")
+        .with_columns([
+            (pl.col("state_name") == pl.col("physical_state")).alias("is_in_state")
+        ])
+        .group_by("state_name")
+        .agg([
+            pl.sum("is_in_state").alias("in_state"),
+            (~pl.col("is_in_state")).sum().alias("out_of_state")
+        ])
+        .with_columns([
+            (pl.col("in_state") + pl.col("out_of_state")).alias("total")
+        ])
+        .sort("total", descending=True)
+    )
+
+
 def count_all_state_names_by_location(
     lf: pl.LazyFrame
 ) -> pl.DataFrame:
@@ -161,50 +207,13 @@ def count_all_state_names_by_location(
     """
     print("Extracting state names from street names and categorizing by location...")
     
-    # Collect to DataFrame for string processing
-    df = lf.collect()
-    
-    # Extract state names for each street and determine if in-state or out-of-state
-    records = []
-    for row in df.iter_rows(named=True):
-        street_name = row['street_name']
-        # Normalize physical state: convert dashes to spaces and lowercase
-        # (data stores states as "new-york" but state names are "new york")
-        physical_state = row['state'].lower().replace("-", " ")
-        
-        found_states = extract_state_names_from_street_name(street_name)
-        
-        # For each state name found in the street name, determine if it's in-state or out-of-state
-        for state_name_in_street in found_states:
-            is_in_state = (state_name_in_street.lower() == physical_state)
-            
-            records.append({
-                'state_name': state_name_in_street,
-                'is_in_state': is_in_state
-            })
-    
-    # Convert to DataFrame
-    records_df = pl.DataFrame(records)
-    
-    # Group by state name and count in-state vs out-of-state
     state_counts = (
-        records_df
-        .with_columns([
-            (~pl.col("is_in_state")).alias("is_out_of_state")
-        ])
-        .group_by("state_name")
-        .agg([
-            pl.sum("is_in_state").alias("in_state"),
-            pl.sum("is_out_of_state").alias("out_of_state")
-        ])
-        .with_columns([
-            (pl.col("in_state") + pl.col("out_of_state")).alias("total")
-        ])
-        .sort("total", descending=True)
+        _count_state_names_by_location(lf)
         .with_row_index("rank")
         .with_columns([
             (pl.col("rank") + 1).alias("rank")  # Convert to 1-based ranking
         ])
+        .collect()
     )
     
     return state_counts
@@ -229,46 +238,7 @@ def count_state_names_by_location_all_states(
     """
     print("Extracting state names from street names and categorizing by location (all states)...")
     
-    # Collect to DataFrame for string processing
-    df = lf.collect()
-    
-    # Extract state names for each street and determine if in-state or out-of-state
-    records = []
-    for row in df.iter_rows(named=True):
-        street_name = row['street_name']
-        # Normalize physical state: convert dashes to spaces and lowercase
-        physical_state = row['state'].lower().replace("-", " ")
-        
-        found_states = extract_state_names_from_street_name(street_name)
-        
-        # For each state name found in the street name, determine if it's in-state or out-of-state
-        for state_name_in_street in found_states:
-            is_in_state = (state_name_in_street.lower() == physical_state)
-            
-            records.append({
-                'state_name': state_name_in_street,
-                'is_in_state': is_in_state
-            })
-    
-    # Convert to DataFrame
-    records_df = pl.DataFrame(records)
-    
-    # Group by state name and count in-state vs out-of-state
-    state_counts = (
-        records_df
-        .with_columns([
-            (~pl.col("is_in_state")).alias("is_out_of_state")
-        ])
-        .group_by("state_name")
-        .agg([
-            pl.sum("is_in_state").alias("in_state"),
-            pl.sum("is_out_of_state").alias("out_of_state")
-        ])
-        .with_columns([
-            (pl.col("in_state") + pl.col("out_of_state")).alias("total")
-        ])
-        .sort("total", descending=True)
-    )
+    state_counts = _count_state_names_by_location(lf).collect()
     
     # Ensure all states are included (even if they have zero counts)
     all_state_names = USState.all_names()
@@ -334,6 +304,32 @@ def draw_axis_break(ax, y_break_start: float, y_break_end: float,
     )
 
 
+def draw_broken_left_spine(ax, y_break_start: float, y_break_end: float):
+    """
+    Draw the left spine in two parts (above and below an axis break).
+    
+    Both segments are drawn as a single LineCollection artist rather than two
+    separate line plots. Call after the y-limits are final.
+    
+    Args:
+        ax: Matplotlib axes
+        y_break_start: Y position where break starts (bottom of gap)
+        y_break_end: Y position where break ends (top of gap)
+    """
+    ylim = ax.get_ylim()
+    spine = LineCollection(
+        [
+            [(0, y_break_end), (0, ylim[0])],  # Top part of spine (above break) - from break to top of chart
+            [(0, ylim[1]), (0, y_break_start)],  # Bottom part of spine (below break) - from bottom of chart to break
+        ],
+        colors='#cccccc',
+        linewidths=0.5,
+        transform=ax.get_yaxis_transform(),
+        clip_on=False
+    )
+    ax.add_collection(spine, autolim=False)
+
+
 def create_stacked_horizontal_bar_plot(
     data_df: pl.DataFrame,
     bottom_column: str,
@@ -473,13 +469,7 @@ def create_stacked_horizontal_bar_plot(
         ax.invert_yaxis()
         
         # Draw left spine in two parts (above and below break)
-        ylim = ax.get_ylim()
-        # Top part of spine (above break) - from break to top of chart
-        ax.plot([0, 0], [break_y_end, ylim[0]], color='#cccccc', linewidth=0.5, 
-                transform=ax.get_yaxis_transform(), clip_on=False)
-        # Bottom part of spine (below break) - from bottom of chart to break
-        ax.plot([0, 0], [ylim[1], break_y_start], color='#cccccc', linewidth=0.5, 
-                transform=ax.get_yaxis_transform(), clip_on=False)
+        draw_broken_left_spine(ax, break_y_start, break_y_end)
     else:
         # Simple mode: standard axis styling
         ax.spines['top'].set_visible(False)
@@ -657,10 +647,16 @@ def get_total_streets_per_state() -> pl.DataFrame:
     return total_counts
 
 
-def calculate_state_fraction_of_all_streets() -> pl.DataFrame:
+def calculate_state_fraction_of_all_streets(
+    state_streets_lf: Optional[pl.LazyFrame] = None
+) -> pl.DataFrame:
     """
     Calculate what fraction of all streets in each state are named after that state.
     
+    Args:
+        state_streets_lf: Optional LazyFrame of state-named streets to reuse. If None,
+            loads them with load_state_streets_df()
+    
     Returns:
         DataFrame with columns: 'state_name', 'streets_named_after_state', 'total_streets', 
         'percentage', 'rank' sorted by percentage descending, with rank column (1-based)
@@ -670,78 +666,40 @@ def calculate_state_fraction_of_all_streets() -> pl.DataFrame:
     # Get total streets per state
     total_streets_df = get_total_streets_per_state()
     
-    # Load state-named streets
-    state_streets_lf = load_state_streets_df()
-    
-    # Count how many streets named after each state are in that state
-    # Collect for string processing
-    df = state_streets_lf.collect()
-    
-    records = []
-    for row in df.iter_rows(named=True):
-        street_name = row['street_name']
-        # Normalize physical state: convert dashes to spaces and lowercase
-        physical_state = row['state'].lower().replace("-", " ")
-        
-        found_states = extract_state_names_from_street_name(street_name)
-        
-        # For each state name found in the street name, check if it's in-state
-        for state_name_in_street in found_states:
-            is_in_state = (state_name_in_street.lower() == physical_state)
-            
-            if is_in_state:
-                records.append({
-                    'state_name': state_name_in_street,
-                    'physical_state': physical_state
-                })
+    # Load state-named streets (unless the caller already has them)
+    if state_streets_lf is None:
+        state_streets_lf = load_state_streets_df()
     
-    # Count streets named after each state that are in that state
+    # Count how many streets named after each state are in that state,
+    # extracting the state name for every street in a single vectorized pass
     state_named_counts = (
-        pl.DataFrame(records)
+        state_streets_lf
+        .select([
+            extract_state_name_expr().alias("state_name"),
+            # Normalize physical state: convert dashes to spaces and lowercase
+            pl.col("state").str.to_lowercase().str.replace_all("-", " ", literal=True)
+            .alias("physical_state"),
+        ])
+        .filter(pl.col("state_name") == pl.col("physical_state"))
         .group_by("state_name")
         .agg(pl.len().alias("streets_named_after_state"))
+        .collect()
     )
     
     # Merge with total street counts
-    # Need to match state names to state identifiers in total_streets_df
     # total_streets_df has 'state' column with values like "new-york", "california"
     # state_named_counts has 'state_name' with values like "new york", "california"
-    
-    # Create a mapping DataFrame from state name to state identifier
-    state_mapping_records = []
-    for state_name in USState.all_names():
-        state_id = state_name.lower().replace(" ", "-")
-        state_mapping_records.append({
-            'state_name_lower': state_name.lower(),
-            'state_id': state_id
-        })
-    state_mapping_df = pl.DataFrame(state_mapping_records)
-    
-    # Add state identifier column to state_named_counts by joining with mapping
-    state_named_counts = (
-        state_named_counts
-        .with_columns([
-            pl.col("state_name").str.to_lowercase().alias("state_name_lower")
-        ])
-        .join(
-            state_mapping_df,
-            on="state_name_lower",
-            how="left"
-        )
-    )
+    # so the identifier is a vectorized string rewrite rather than a lookup table
+    state_named_counts = state_named_counts.with_columns([
+        pl.col("state_name").str.to_lowercase().str.replace_all(" ", "-", literal=True)
+        .alias("state_id")
+    ])
     
     # Merge with total_streets_df to include all states
     # This ensures states with zero streets named after themselves are included
-    # First, join total_streets_df with state_mapping_df to get state_name for all states
-    # Then join with state_named_counts to get counts (left join keeps all states)
+    # (left join keeps all states)
     result = (
         total_streets_df
-        .join(
-            state_mapping_df,
-            left_on="state",
-            right_on="state_id",
-            how="left"
-        )
         .join(
             state_named_counts.select(["state_id", "streets_named_after_state"]),
             left_on="state",  # Use "state" from total_streets_df which matches "state_id"
@@ -750,11 +708,9 @@ def calculate_state_fraction_of_all_streets() -> pl.DataFrame:
         )
         .with_columns([
             pl.col("streets_named_after_state").fill_null(0),  # Fill nulls with 0 for states with no matches
-            # Convert state_name_lower to title case, with fallback to deriving from state if null
-            pl.coalesce([
-                pl.col("state_name_lower").str.to_titlecase(),
-                pl.col("state").str.replace("-", " ").str.to_titlecase()
-            ]).alias("state_name")
+            # Derive display name from the state identifier ("new-york" -> "New York")
+            pl.col("state").str.replace_all("-", " ", literal=True).str.to_titlecase()
+            .alias("state_name")
         ])
         .with_columns([
             (pl.col("streets_named_after_state") / pl.col("total_streets") * 100).alias("percentage")
@@ -882,13 +838,7 @@ def create_percentage_bar_plot(
     ax.invert_yaxis()
     
     # Draw left spine in two parts (above and below break)
-    ylim = ax.get_ylim()
-    # Top part of spine (above break) - from break to top of chart
-    ax.plot([0, 0], [break_y_end, ylim[0]], color='#cccccc', linewidth=0.5, 
-            transform=ax.get_yaxis_transform(), clip_on=False)
-    # Bottom part of spine (below break) - from bottom of chart to break
-    ax.plot([0, 0], [ylim[1], break_y_start], color='#cccccc', linewidth=0.5, 
-            transform=ax.get_yaxis_transform(), clip_on=False)
+    draw_broken_left_spine(ax, break_y_start, break_y_end)
     
     # Very subtle grid only on x-axis
     ax.grid(True, axis='x', linestyle='-', linewidth=0.5, alpha=0.2, color='#cccccc')
@@ -1050,8 +1000,12 @@ def plot_state_names(
             
             # Print summary statistics
             print(f"\nAll {num_states} states in street names (in-state vs out-of-state):")
-            print(f"States with zero occurrences: {len(state_counts.filter(pl.col('total') == 0))}")
-            print(f"States with at least one occurrence: {len(state_counts.filter(pl.col('total') > 0))}")
+            num_zero, num_nonzero = state_counts.select(
+                (pl.col('total') == 0).sum().alias('num_zero'),
+                (pl.col('total') > 0).sum().alias('num_nonzero'),
+            ).row(0)
+            print(f"States with zero occurrences: {num_zero}")
+            print(f"States with at least one occurrence: {num_nonzero}")
             
             return state_counts
         
@@ -16,7 +16,7 @@ import numpy as np
 # Add parent directory to path to import workspace modules
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from workspace.load_street_df import load_state_streets_df
-from workspace.explore.state_sts.most_common_state_st import extract_state_names_from_street_name
+from workspace.explore.state_sts.most_common_state_st import extract_state_name_expr
 from workspace.plot_utils import (
     setup_tufte_style,
     save_plot,
@@ -42,47 +42,25 @@ def calculate_self_vs_other_named(lf: pl.LazyFrame) -> pl.DataFrame:
     """
     print("Calculating self-named vs other-named streets per physical state...")
     
-    # Collect to DataFrame for string processing
-    df = lf.collect()
-    
-    # Process each street
-    records = []
-    for row in df.iter_rows(named=True):
-        street_name = row['street_name']
-        # Normalize physical state: convert dashes to spaces and lowercase
-        physical_state = row['state'].lower().replace("-", " ")
-        
-        # Extract state names from street name
-        found_states = extract_state_names_from_street_name(street_name)
-        
-        if not found_states:
-            # Shouldn't happen if we're using load_state_streets_df, but handle it
-            continue
-        
-        # Check if any extracted state name matches the physical state
-        is_self_named = any(
-            state_name.lower() == physical_state 
-            for state_name in found_states
-        )
-        
-        records.append({
-            'physical_state': physical_state,
-            'is_self_named': is_self_named
-        })
-    
-    # Convert to DataFrame
-    records_df = pl.DataFrame(records)
-    
-    # Group by physical state and count
-    state_counts = (
-        records_df
+    # Extract the state name for every street in a single vectorized pass and
+    # compare it against the normalized physical state
+    state_counts_lf = (
+        lf
+        .select([
+            extract_state_name_expr().alias("matched_state"),
+            # Normalize physical state: convert dashes to spaces and lowercase
+            pl.col("state").str.to_lowercase().str.replace_all("-", " ", literal=True)
+            .alias("physical_state"),
+        ])
+        # Shouldn't drop anything if we're using load_state_streets_df, but handle it
+        .drop_nulls("matched_state")
         .with_columns([
-            (~pl.col("is_self_named")).alias("is_other_named")
+            (pl.col("matched_state") == pl.col("physical_state")).alias("is_self_named")
         ])
         .group_by("physical_state")
         .agg([
             pl.sum("is_self_named").alias("self_named"),
-            pl.sum("is_other_named").alias("other_named")
+            (~pl.col("is_self_named")).sum().alias("other_named")
         ])
         .with_columns([
             (pl.col("self_named") + pl.col("other_named")).alias("total")
@@ -94,6 +72,13 @@ def calculate_self_vs_other_named(lf: pl.LazyFrame) -> pl.DataFrame:
         .rename({"physical_state": "state_name"})
     )
     
+    # The streaming engine keeps memory bounded on large inputs; fall back to
+    # the default engine if it rejects the plan
+    try:
+        state_counts = state_counts_lf.collect(engine="streaming")
+    except pl.exceptions.PolarsError:
+        state_counts = state_counts_lf.collect()
+    
     return state_counts
 
 
@@ -141,8 +126,8 @@ def create_grouped_horizontal_bar_plot(
     # Set up style
     setup_tufte_style()
     
-    # Import draw_axis_break from most_common_state_st
-    from workspace.explore.state_sts.most_common_state_st import draw_axis_break
+    # Import axis break helpers from most_common_state_st
+    from workspace.explore.state_sts.most_common_state_st import draw_axis_break, draw_broken_left_spine
     
     # Color scheme: warm yellow-gold for self-named, cool green-teal for other-named
     self_color = '#E3B778'  # Warm yellow-gold for self-named
@@ -156,15 +141,14 @@ def create_grouped_horizontal_bar_plot(
         top_items = data_df.head(top_n)
         bottom_items = data_df.tail(bottom_n)
         plot_data = pl.concat([top_items, bottom_items])
-        data_list = plot_data.to_dicts()
         
-        # Extract data
-        labels = [item[label_column] for item in data_list]
-        self_values = [item[self_column] for item in data_list]
-        other_values = [item[other_column] for item in data_list]
+        # Extract data column-wise (no per-row dicts)
+        labels = plot_data.get_column(label_column).to_list()
+        self_values = plot_data.get_column(self_column).to_list()
+        other_values = plot_data.get_column(other_column).to_list()
         
         if rank_column:
-            ranks = [item[rank_column] for item in data_list]
+            ranks = plot_data.get_column(rank_column).to_list()
             display_labels = [f"{rank}. {label}" for rank, label in zip(ranks, labels)]
         else:
             display_labels = labels
@@ -177,14 +161,12 @@ def create_grouped_horizontal_bar_plot(
         num_items = len(y_positions)
     else:
         # Simple mode: use all data
-        data_list = data_df.to_dicts()
-        if reverse_order:
-            data_list.reverse()  # Highest at top
+        plot_data = data_df.reverse() if reverse_order else data_df  # Highest at top
         
-        # Extract data
-        labels = [item[label_column] for item in data_list]
-        self_values = [item[self_column] for item in data_list]
-        other_values = [item[other_column] for item in data_list]
+        # Extract data column-wise (no per-row dicts)
+        labels = plot_data.get_column(label_column).to_list()
+        self_values = plot_data.get_column(self_column).to_list()
+        other_values = plot_data.get_column(other_column).to_list()
         display_labels = labels
         
         # Create contiguous y-positions
@@ -246,13 +228,7 @@ def create_grouped_horizontal_bar_plot(
         ax.invert_yaxis()
         
         # Draw left spine in two parts (above and below break)
-        ylim = ax.get_ylim()
-        # Top part of spine (above break) - from break to top of chart
-        ax.plot([0, 0], [break_y_end, ylim[0]], color='#cccccc', linewidth=0.5, 
-                transform=ax.get_yaxis_transform(), clip_on=False)
-        # Bottom part of spine (below break) - from bottom of chart to break
-        ax.plot([0, 0], [ylim[1], break_y_start], color='#cccccc', linewidth=0.5, 
-                transform=ax.get_yaxis_transform(), clip_on=False)
+        draw_broken_left_spine(ax, break_y_start, break_y_end)
     else:
         # Simple mode: standard axis styling
         ax.spines['top'].set_visible(False)
@@ -283,48 +259,27 @@ def create_grouped_horizontal_bar_plot(
     if show_value_labels:
         max_value = max(max(self_values), max(other_values)) if self_values and other_values else 0
         
-        for i, (self_val, other_val) in enumerate(zip(self_values, other_values)):
-            total_val = self_val + other_val
-            
-            # Label for self-named bar
-            if self_val > 0:
-                ax.text(
-                    self_val + max_value * 0.015,
-                    self_positions[i],
-                    f"{int(self_val):,}",
-                    va='center',
-                    ha='left',
-                    fontsize=9,
-                    color='#111111'
-                )
-            
-            # Label for other-named bar
-            if other_val > 0:
-                ax.text(
-                    other_val + max_value * 0.015,
-                    other_positions[i],
-                    f"{int(other_val):,}",
-                    va='center',
-                    ha='left',
-                    fontsize=9,
-                    color='#111111'
-                )
-            
-            # Add percentage annotation after both bars
-            if total_val > 0:
-                self_pct = (self_val / total_val) * 100
-                # Position after the rightmost bar (other-named) with more spacing
-                x_position = other_val + max_value * 0.10
-                ax.text(
-                    x_position,
-                    y_positions[i],
-                    f"({self_pct:.0f}%)",
-                    va='center',
-                    ha='left',
-                    fontsize=9,
-                    color='#666666',
-                    style='italic'
-                )
+        # Count labels for both bar groups in one call each (blank for zero-length bars)
+        label_style = dict(padding=3, fontsize=9, color='#111111')
+        ax.bar_label(bars_self, labels=[f"{int(v):,}" if v > 0 else "" for v in self_values], **label_style)
+        ax.bar_label(bars_other, labels=[f"{int(v):,}" if v > 0 else "" for v in other_values], **label_style)
+        
+        # Add percentage annotation after both bars, positioned after the rightmost
+        # bar (other-named) with more spacing; positions are computed up front
+        self_arr = np.asarray(self_values, dtype=float)
+        total_arr = self_arr + np.asarray(other_values, dtype=float)
+        pct_x_positions = np.asarray(other_values, dtype=float) + max_value * 0.10
+        for i in np.flatnonzero(total_arr > 0):
+            ax.text(
+                pct_x_positions[i],
+                y_positions[i],
+                f"({self_arr[i] / total_arr[i] * 100:.0f}%)",
+                va='center',
+                ha='left',
+                fontsize=9,
+                color='#666666',
+                style='italic'
+            )
         
         # Extra space for labels and percentage annotations
         if max_value > 0:
@@ -350,7 +305,8 @@ def plot_self_vs_other_named(
     bottom_n: int = 3,
     width: Optional[float] = None,
     height: Optional[float] = None,
-    output_path: Optional[Path] = None
+    output_path: Optional[Path] = None,
+    results_format: str = "print"
 ) -> pl.DataFrame:
     """
     Plot self-named vs other-named streets for top N and bottom N states.
@@ -367,6 +323,8 @@ def plot_self_vs_other_named(
         width: Figure width in inches. If None, uses default (4.5)
         height: Figure height in inches. If None, auto-calculates based on number of items
         output_path: Optional path to save the plot. If None, saves to main_outputs/state_sts/
+        results_format: How to emit the per-state results: 'print' (default) prints tables
+            to stdout, 'parquet' or 'arrow' writes them next to the plot instead
         
     Returns:
         DataFrame with the plotted data
@@ -377,13 +335,9 @@ def plot_self_vs_other_named(
     # Calculate self vs other named
     state_counts = calculate_self_vs_other_named(lf)
     
-    # Add rank column
-    state_counts = state_counts.with_row_index("rank").with_columns([
-        (pl.col("rank") + 1).alias("rank")  # Convert to 1-based ranking
-    ])
-    
-    # Capitalize state names for display (title case) - do this before passing to plotting function
-    state_counts = state_counts.with_columns(
+    # Add 1-based rank column and capitalize state names for display (title case)
+    # in a single projection - do this before passing to plotting function
+    state_counts = state_counts.with_row_index("rank", offset=1).with_columns(
         pl.col("state_name").str.to_titlecase().alias("state_name")
     )
     
@@ -437,8 +391,17 @@ def plot_self_vs_other_named(
     
     save_plot(fig, output_path)
     
+    # Write the results in a machine-readable format instead of printing them
+    if results_format == "parquet":
+        results_path = output_path.with_suffix(".parquet")
+        state_counts.write_parquet(results_path)
+        print(f"Results saved to: {results_path}")
+    elif results_format == "arrow":
+        results_path = output_path.with_suffix(".arrow")
+        state_counts.write_ipc(results_path, compression="zstd")
+        print(f"Results saved to: {results_path}")
     # Print the results
-    if use_break_mode:
+    elif use_break_mode:
         print(f"\nTop {top_n} states by fraction of self-named streets:")
         print(state_counts.head(top_n))
         print(f"\nBottom {bottom_n} states by fraction of self-named streets:")
@@ -487,6 +450,12 @@ def main():
         default=None,
         help='Output path for the plot (default: saves to main_outputs/state_sts/)'
     )
+    parser.add_argument(
+        '--format',
+        choices=['print', 'parquet', 'arrow'],
+        default='print',
+        help='How to emit per-state results: print tables (default), or write a .parquet/.arrow file next to the plot'
+    )
     
     args = parser.parse_args()
     
@@ -495,7 +464,8 @@ def main():
         bottom_n=args.bottom_n,
         width=args.width,
         height=args.height,
-        output_path=args.output
+        output_path=args.output,
+        results_format=args.format
     )
 
 
@@ -47,11 +47,12 @@ def plot_street_types(top_n: int = 15, output_path: Path = None):
     # Count occurrences of each highway type (all in lazy mode for efficiency)
     print("Counting highway type occurrences...")
     type_counts = (
-        lf.group_by('highway_type')
+        lf.select('highway_type')  # Only read the one column from parquet
+        .group_by('highway_type')
         .agg(pl.len().alias('count'))
         .sort('count', descending=True)
         .head(top_n)
-        .collect()  # Materialize only the top N results
+        .collect(engine="streaming")  # Materialize only the top N results, streaming the scan
     )
     
     # Convert to list for easier indexing (reverse for top-to-bottom display)
@@ -113,14 +114,10 @@ def plot_street_types(top_n: int = 15, output_path: Path = None):
     ax.set_xlabel('Number of Streets', labelpad=8)
     ax.set_ylabel('')  # No y-label needed for horizontal bars
     
-    # Add value labels on bars (clean, readable)
+    # Add value labels on bars (clean, readable), at the end of each bar with small padding
     max_count = max(counts)
-    for i, count in enumerate(counts):
-        # Position label at end of bar with small padding
-        ax.text(count + max_count * 0.015, i, 
-                f"{int(count):,}", 
-                va='center', ha='left',
-                fontsize=10, color='#111111')
+    ax.bar_label(bars, labels=[f"{int(count):,}" for count in counts],
+                 padding=3, fontsize=10, color='#111111')
     
     # Clean up x-axis ticks
     ax.tick_params(axis='x', length=4, width=0.5, colors='#333333')
@@ -32,20 +32,15 @@ def plot_most_common_words(top_n: int = 8, output_path: Path = None):
     print("Splitting street names into words and counting occurrences...")
     word_counts = (
         lf
-        .select("street_name")
-        .with_columns(
-            # Split street names by whitespace into a list of words
-            pl.col("street_name").str.split(" ").alias("words")
+        .select(
+            # Lowercase whole names for consistent counting, then split by
+            # whitespace into a list of words (one projection, no extra column)
+            pl.col("street_name").str.to_lowercase().str.split(" ").alias("word")
         )
-        .explode("words")  # Expand each word into its own row
+        .explode("word")  # Expand each word into its own row
         .filter(
-            # Filter out empty strings and common street type suffixes
-            (pl.col("words") != "") &
-            (pl.col("words").str.len_chars() > 0)
-        )
-        .with_columns(
-            # Convert to lowercase for consistent counting
-            pl.col("words").str.to_lowercase().alias("word")
+            # Filter out empty strings (from repeated spaces)
+            pl.col("word") != ""
         )
         .group_by("word")
         .agg(pl.len().alias("count"))
@@ -4,6 +4,8 @@
 import sys
 from pathlib import Path
 import polars as pl
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend; this script only writes files
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 import numpy as np
@@ -11,6 +13,8 @@ import numpy as np
 # Add parent directory to path to import workspace modules
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 from workspace.explore.street_words.tfidf_state_words import compute_tfidf_by_state
+from workspace.load_street_df import DEFAULT_DATA_DIR, DEFAULT_CACHE_DIR
+from workspace.cache_utils import FileCache
 from workspace.explore.street_words.word_colors import get_word_color
 from workspace.plot_utils import setup_tufte_style, get_color_palette
 
@@ -115,27 +119,32 @@ def create_tfidf_tile_grid(
     )
     
     # Find global max score for shared x-axis
-    global_max_score = tfidf_data['tfidf_score'].max()
+    global_max_score = tfidf_data.select(pl.col('tfidf_score').max()).item()
     
+    # Split the top N rows of every state into per-state frames in one pass,
+    # instead of filtering the full table once per state
+    state_buckets = (
+        tfidf_data
+        .group_by('state', maintain_order=True)
+        .head(top_n)
+        .partition_by('state', as_dict=True)
+    )
     # Process data for each state
     for state, (row, col, abbrev) in US_STATE_GRID.items():
-        # Get data for this state
-        state_data = tfidf_data.filter(pl.col('state') == state).head(top_n)
+        # Get data for this state (states absent from the data are skipped
+        # without touching the frame)
+        state_data = state_buckets.get((state,))
         
-        if len(state_data) == 0:
+        if state_data is None or state_data.height == 0:
             continue
         
         # Create subplot for this state
         ax = fig.add_subplot(gs[row, col])
         ax.set_facecolor('none')
         
-        # Extract words and scores
-        words = state_data['word'].to_list()
-        scores = state_data['tfidf_score'].to_list()
-        
-        # Reverse order so highest is at top
-        words = words[::-1]
-        scores = scores[::-1]
+        # Extract words and scores, reversed (as NumPy views) so highest is at top
+        words = state_data['word'].to_numpy()[::-1]
+        scores = state_data['tfidf_score'].to_numpy()[::-1]
         
         # Create horizontal bar chart with word-specific colors
         y_pos = np.arange(len(words))
@@ -229,6 +238,11 @@ def main():
         default=[22, 16],
         help='Figure size in inches (width height, default: 22 16)'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Disable caching and recompute TF-IDF scores from scratch'
+    )
     
     args = parser.parse_args()
     
@@ -239,15 +253,33 @@ def main():
         output_dir.mkdir(parents=True, exist_ok=True)
         args.output = output_dir / "tfidf_grid.svg"
     
-    # Compute TF-IDF data
+    # Compute TF-IDF data (cached on its parameters and the source street files,
+    # so re-styling the plot doesn't recompute the scores)
     print("Computing TF-IDF scores...")
-    tfidf_data = compute_tfidf_by_state(
-        min_word_freq=args.min_freq,
-        top_n_per_state=args.top_n,
-        output_path=None,  # Don't save CSV here
-        filter_stop_words=True,
-        num_stop_words=25
-    )
+    tfidf_params = {
+        "min_word_freq": args.min_freq,
+        "top_n_per_state": args.top_n,
+        "filter_stop_words": True,
+        "num_stop_words": 25,
+    }
+    
+    def compute():
+        return compute_tfidf_by_state(
+            **tfidf_params,
+            output_path=None,  # Don't save CSV here
+            use_cache=not args.no_cache,
+        )
+    
+    if args.no_cache:
+        tfidf_data = compute()
+    else:
+        cache = FileCache(cache_dir=DEFAULT_CACHE_DIR)
+        tfidf_data = cache.get_or_compute(
+            key="tfidf_by_state",
+            params=tfidf_params,
+            dependencies=sorted(DEFAULT_DATA_DIR.glob("*_streets.parquet")),
+            compute_fn=compute,
+        )
     
     # Create tile grid visualization
     print("Creating tile grid map...")
@@ -9,7 +9,10 @@ from typing import Optional
 
 # Add parent directory to path to import workspace modules
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
-from workspace.load_street_df import load_street_df
+from workspace.load_street_df import (
+    load_street_df, DEFAULT_DATA_DIR, DEFAULT_CACHE_DIR, DEFAULT_FILTER_TYPES
+)
+from workspace.cache_utils import FileCache
 from workspace.states import USState
 
 
@@ -18,7 +21,8 @@ def compute_tfidf_by_state(
     top_n_per_state: int = 3,
     output_path: Optional[Path] = None,
     filter_stop_words: bool = True,
-    num_stop_words: int = 25
+    num_stop_words: int = 25,
+    use_cache: bool = True
 ) -> pl.DataFrame:
     """
     Compute TF-IDF scores for words in street names by state.
@@ -38,6 +42,8 @@ def compute_tfidf_by_state(
         output_path: Optional path to save results as CSV
         filter_stop_words: Whether to filter out common street type words (like "road", "street", "drive")
         num_stop_words: Number of most common words to filter out (default: 25)
+        use_cache: If True (default), reuse the cached tokenized (street, word) frame
+            instead of re-splitting every street name
         
     Returns:
         DataFrame with columns: state, word, tfidf_score, word_count, num_streets_with_word
@@ -45,131 +51,110 @@ def compute_tfidf_by_state(
     print("Loading street data from all states...")
     lf = load_street_df()
     
-    # First, get total number of streets for IDF calculation
-    print("Counting total streets...")
-    total_streets = lf.select(pl.len()).collect().item()
-    print(f"Total streets: {total_streets:,}")
-    
-    # Identify stop words (most common words) if filtering is enabled
-    stop_words = set()
-    if filter_stop_words:
-        print(f"Identifying top {num_stop_words} most common words to filter...")
-        stop_words_df = (
-            lf
-            .select("street_name")
-            .with_columns(pl.col("street_name").str.split(" ").alias("words"))
-            .explode("words")
-            .filter((pl.col("words") != "") & (pl.col("words").str.len_chars() > 0))
-            .with_columns(pl.col("words").str.to_lowercase().alias("word"))
-            .group_by("word")
-            .agg(pl.len().alias("count"))
-            .sort("count", descending=True)
-            .head(num_stop_words)
-            .collect()
-        )
-        stop_words = set(stop_words_df["word"].to_list())
-        print(f"Filtering out: {', '.join(sorted(stop_words))}")
-    
-    # Split street names into words, keeping track of which street each word came from
+    # Tokenize once; every later step derives from this plan and the whole
+    # pipeline stays lazy until a single collect_all at the end, which shares
+    # the scan + split + explode between all of its outputs
     print("Extracting words from street names...")
-    
-    # Create a unique street identifier (state + street_name)
-    streets_with_words = (
+    tokenize_lf = (
         lf
         .select(["street_name", "state"])
         .with_columns(
-            # Create unique street ID
-            (pl.col("state") + ":" + pl.col("street_name")).alias("street_id")
-        )
-        .with_columns(
-            # Split street names by whitespace into a list of words
-            pl.col("street_name").str.split(" ").alias("words")
-        )
-        .explode("words")  # Expand each word into its own row
-        .filter(
-            # Filter out empty strings
-            (pl.col("words") != "") &
-            (pl.col("words").str.len_chars() > 0)
-        )
-        .with_columns(
-            # Convert to lowercase for consistent counting
-            pl.col("words").str.to_lowercase().alias("word")
+            # Create unique street ID: a UInt64 hash of (state, street_name) is
+            # much cheaper to dedup and count than a concatenated string
+            pl.struct(["state", "street_name"]).hash(seed=0).alias("street_id"),
+            # Lowercase before splitting so the exploded column needs no second pass
+            pl.col("street_name").str.to_lowercase().str.split(" ").alias("word")
         )
+        .explode("word")  # Expand each word into its own row
+        .filter(pl.col("word").str.len_bytes() > 0)  # Filter out empty strings (byte length needs no UTF-8 decode)
         .select(["street_id", "state", "word"])
-        .unique()  # Each word appears at most once per street (TF = 1 or 0)
-        .collect()
     )
     
-    # Filter out stop words if enabled
-    if filter_stop_words and stop_words:
-        print(f"Filtering out {len(stop_words)} stop words...")
-        streets_with_words = streets_with_words.filter(~pl.col("word").is_in(list(stop_words)))
+    # The street corpus is static, so cache the tokenized frame keyed on the
+    # source files and re-scan it on later runs instead of re-tokenizing.
+    # Passing the LazyFrame streams the tokens straight into the cache file
+    if use_cache:
+        cache = FileCache(cache_dir=DEFAULT_CACHE_DIR)
+        words_lf = cache.get_or_compute(
+            key="street_words",
+            params={"data_dir": str(DEFAULT_DATA_DIR), "filter_to_types": DEFAULT_FILTER_TYPES},
+            dependencies=sorted(DEFAULT_DATA_DIR.glob("*_streets.parquet")),
+            compute_fn=lambda: tokenize_lf,
+            lazy=True,
+        )
+    else:
+        words_lf = tokenize_lf
+    
+    pairs_lf = words_lf
+    stop_words_queries = []
+    if filter_stop_words:
+        # Stop words = most common words, counted over every occurrence
+        stop_words_lf = (
+            words_lf
+            .group_by("word")
+            .agg(pl.len().alias("count"))
+            .sort("count", descending=True)
+            .head(num_stop_words)
+        )
+        # Anti-join against the tiny stop-word frame before aggregating, so
+        # the highest-volume tokens never reach the group_by
+        pairs_lf = pairs_lf.join(stop_words_lf.select("word"), on="word", how="anti")
+        stop_words_queries.append(stop_words_lf)
     
-    print(f"Extracted {len(streets_with_words):,} (street, word) pairs")
+    # Count distinct streets per (state, word) straight from the tokens: this
+    # dedups words repeated within a street (TF = 1 or 0) and counts in one pass
+    state_word_counts_lf = (
+        pairs_lf
+        .group_by(["state", "word"])
+        .agg(pl.col("street_id").n_unique().alias("word_count"))  # Number of streets with this word in state
+    )
     
-    # Calculate document frequency: how many streets contain each word
-    print("Computing document frequencies (number of streets per word)...")
-    word_df = (
-        streets_with_words
+    # Calculate document frequency (how many streets contain each word) and
+    # IDF for each word: log(total_streets / num_streets_with_word)
+    # street_id encodes the state, so the nationwide count is a sum over states
+    total_lf = lf.select(pl.len().alias("total_streets"))
+    word_idf_lf = (
+        state_word_counts_lf
         .group_by("word")
-        .agg(pl.col("street_id").n_unique().alias("num_streets_with_word"))
+        .agg(pl.col("word_count").sum().alias("num_streets_with_word"))
+        .join(total_lf, how="cross")
+        .with_columns(
+            (pl.col("total_streets") / pl.col("num_streets_with_word")).log().alias("idf")
+        )
+        .select(["word", "num_streets_with_word", "idf"])
     )
     
-    # Calculate IDF for each word: log(total_streets / num_streets_with_word)
-    word_df = word_df.with_columns([
-        (total_streets / pl.col("num_streets_with_word")).log().alias("idf")
-    ])
-    
-    print(f"Computed IDF for {len(word_df):,} unique words")
-    
-    # Join IDF back to street-word pairs
-    streets_with_words = streets_with_words.join(word_df, on="word", how="left")
-    
-    # Calculate TF-IDF for each (street, word) pair
-    # Since each word appears at most once per street, TF = 1, so TF-IDF = IDF
-    streets_with_words = streets_with_words.with_columns([
-        pl.col("idf").alias("tfidf")  # TF=1, so TF-IDF = IDF
-    ])
-    
-    # Sum TF-IDF scores by state and word
-    print("Aggregating TF-IDF scores by state...")
+    # Keep words that appear at least min_word_freq times in a state, then
+    # score the aggregate. Since TF = 1, the summed TF-IDF over a state's
+    # streets is simply word_count * idf
     state_word_tfidf = (
-        streets_with_words
-        .group_by(["state", "word"])
-        .agg([
-            pl.col("tfidf").sum().alias("tfidf_score"),  # Sum of TF-IDF across all streets in state
-            pl.col("street_id").n_unique().alias("word_count"),  # Number of streets with this word in state
-            pl.col("num_streets_with_word").first().alias("num_streets_with_word")  # Total streets with word nationwide
-        ])
+        state_word_counts_lf
+        .filter(pl.col("word_count") >= min_word_freq)
+        .join(word_idf_lf, on="word")
+        .with_columns((pl.col("word_count") * pl.col("idf")).alias("tfidf_score"))
+        .select(["state", "word", "tfidf_score", "word_count", "num_streets_with_word"])
     )
     
-    # Filter to words that appear at least min_word_freq times in a state
-    print(f"Filtering to words with at least {min_word_freq} occurrences per state...")
-    state_word_tfidf = state_word_tfidf.filter(pl.col("word_count") >= min_word_freq)
-    print(f"After filtering: {len(state_word_tfidf):,} (state, word) pairs remain")
-    
     # Get top N words per state by TF-IDF score
-    print(f"Extracting top {top_n_per_state} words per state...")
-    top_words = (
+    # top_k_by per state keeps only N rows per group instead of globally
+    # sorting every (state, word) pair just to take the head of each state
+    top_words_lf = (
         state_word_tfidf
-        .sort(["state", "tfidf_score"], descending=[False, True])
         .group_by("state")
-        .agg([
-            pl.col("word").head(top_n_per_state).alias("words"),
-            pl.col("tfidf_score").head(top_n_per_state).alias("tfidf_scores"),
-            pl.col("word_count").head(top_n_per_state).alias("word_counts"),
-            pl.col("num_streets_with_word").head(top_n_per_state).alias("num_streets"),
-        ])
-        .sort("state")
+        .agg(pl.all().top_k_by("tfidf_score", top_n_per_state))
+        .explode(pl.exclude("state"))  # Explode for easier viewing
+        .sort("state", maintain_order=True)
     )
     
-    # Explode for easier viewing
-    top_words_exploded = (
-        top_words
-        .explode(["words", "tfidf_scores", "word_counts", "num_streets"])
-        .rename({"words": "word", "tfidf_scores": "tfidf_score", 
-                 "word_counts": "word_count", "num_streets": "num_streets_with_word"})
+    print(f"Computing top {top_n_per_state} TF-IDF words per state "
+          f"(min {min_word_freq} streets per state)...")
+    total_df, top_words_exploded, *stop_words_df = pl.collect_all(
+        [total_lf, top_words_lf, *stop_words_queries],
+        engine="streaming",
     )
+    print(f"Total streets: {total_df.item():,}")
+    if stop_words_df:
+        print(f"Filtered out: {', '.join(sorted(stop_words_df[0]['word'].to_list()))}")
     
     # Save to CSV if output path provided
     if output_path:
@@ -191,20 +176,26 @@ def print_results(df: pl.DataFrame, states_to_show: Optional[list[str]] = None):
     if states_to_show:
         df = df.filter(pl.col("state").is_in(states_to_show))
     
-    print("\n" + "="*80)
-    print("TOP TF-IDF WORDS BY STATE (Street-as-Document)")
-    print("="*80)
+    lines = [
+        "\n" + "="*80,
+        "TOP TF-IDF WORDS BY STATE (Street-as-Document)",
+        "="*80,
+    ]
     
-    for state in df["state"].unique().sort():
-        state_data = df.filter(pl.col("state") == state)
-        print(f"\n{state.upper()}")
-        print("-" * 60)
+    # Single pass over rows grouped by state; write everything in one print call
+    current_state = None
+    for row in df.sort("state", maintain_order=True).iter_rows(named=True):
+        if row["state"] != current_state:
+            current_state = row["state"]
+            lines.append(f"\n{current_state.upper()}")
+            lines.append("-" * 60)
         
-        for row in state_data.iter_rows(named=True):
-            print(f"  {row['word']:20s} | "
-                  f"TF-IDF: {row['tfidf_score']:8.2f} | "
-                  f"In State: {row['word_count']:5d} streets | "
-                  f"Nationwide: {row['num_streets_with_word']:6d} streets")
+        lines.append(f"  {row['word']:20s} | "
+                     f"TF-IDF: {row['tfidf_score']:8.2f} | "
+                     f"In State: {row['word_count']:5d} streets | "
+                     f"Nationwide: {row['num_streets_with_word']:6d} streets")
+    
+    print("\n".join(lines))
 
 
 def main():
@@ -249,6 +240,11 @@ def main():
         default=25,
         help='Number of most common words to filter out (default: 25)'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-tokenize street names instead of using the cached word frame'
+    )
     
     args = parser.parse_args()
     
@@ -265,7 +261,8 @@ def main():
         top_n_per_state=args.top_n,
         output_path=args.output,
         filter_stop_words=not args.no_filter_stop_words,
-        num_stop_words=args.num_stop_words
+        num_stop_words=args.num_stop_words,
+        use_cache=not args.no_cache
     )
     
     # Print results
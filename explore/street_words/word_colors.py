@@ -120,12 +120,13 @@ def get_word_color(word: str) -> str:
     Raises:
         KeyError: If word is not in the color mapping
     """
-    if word not in WORD_COLORS:
+    try:
+        return WORD_COLORS[word]
+    except KeyError:
         raise KeyError(
             f"Word '{word}' not found in color mapping. "
             f"Please add it to WORD_COLORS in word_colors.py"
-        )
-    return WORD_COLORS[word]
+        ) from None
 
 
 def get_all_mapped_words() -> list[str]:
@@ -1,5 +1,7 @@
 """Clean interface for loading street data from processed parquet files."""
 
+import functools
+import re
 from pathlib import Path
 from typing import Optional, Union
 import polars as pl
@@ -21,6 +23,30 @@ script_dir = Path(__file__).parent
 DEFAULT_DATA_DIR = script_dir / "data" / "streetdfs_1mi"
 DEFAULT_CACHE_DIR = script_dir / "data" / "cache"
 
+# Street names containing an ASCII digit count as numbered (e.g. "Virginia Route 32B").
+# A byte class rather than Unicode \d, which is cheaper to scan and keeps every
+# analysis that excludes numbered streets agreeing on the same set
+NUMBERED_STREET_PATTERN = r"[0-9]"
+
+# US state names in USState order, and each name's position in that order
+STATE_NAMES = tuple(USState.all_names())
+STATE_NAME_ORDER = {state_name: i for i, state_name in enumerate(STATE_NAMES)}
+
+# State names in the order a street name's state is picked when several match:
+# longest first, multi-word before single-word on ties, then USState order
+STATE_NAMES_BY_PRIORITY = tuple(
+    sorted(STATE_NAMES, key=lambda state_name: (-len(state_name), " " not in state_name))
+)
+STATE_NAME_PRIORITY = {state_name: i for i, state_name in enumerate(STATE_NAMES_BY_PRIORITY)}
+
+# Any US state name as a whole word (\b for word boundaries), alternatives in
+# priority order so a left-to-right scan takes "west virginia" over "virginia".
+# Built once at import and reused as-is, so regex caches keep hitting the
+# same compiled pattern
+STATE_NAME_PATTERN = (
+    r"\b(?:" + "|".join(re.escape(state_name) for state_name in STATE_NAMES_BY_PRIORITY) + r")\b"
+)
+
 
 def _get_parquet_paths(
     state: Optional[Union[str, list[str]]],
@@ -36,6 +62,37 @@ def _get_parquet_paths(
     Returns:
         List of parquet file paths
         
+    Raises:
+        FileNotFoundError: If data directory or requested states not found
+    """
+    state_key = state if isinstance(state, str) or state is None else tuple(state)
+    # Adding or removing a file changes the directory's modification time
+    dir_mtime = data_dir.stat().st_mtime if data_dir.exists() else None
+    return list(_get_parquet_paths_cached(state_key, data_dir, dir_mtime))
+
+
+@functools.lru_cache(maxsize=64)
+def _get_parquet_paths_cached(
+    state: Optional[Union[str, tuple[str, ...]]],
+    data_dir: Path,
+    dir_mtime: Optional[float],
+) -> tuple[Path, ...]:
+    """
+    Cached implementation of _get_parquet_paths.
+    
+    Memoized on the data directory's modification time, so loading the same
+    states repeatedly (e.g. once for the scan and once for the cache
+    dependencies) doesn't re-glob and re-stat the data directory, while files
+    added or removed since are picked up. Failed lookups raise and are not cached.
+    
+    Args:
+        state: Single state name, tuple of state names, or None for all states
+        data_dir: Directory containing parquet files
+        dir_mtime: Modification time of data_dir (only used as part of the cache key)
+        
+    Returns:
+        Tuple of parquet file paths
+        
     Raises:
         FileNotFoundError: If data directory or requested states not found
     """
@@ -54,7 +111,7 @@ def _get_parquet_paths(
                 f"No parquet files found in {data_dir}\n"
                 "Please run data processing scripts first."
             )
-        return parquet_files
+        return tuple(parquet_files)
     
     # Convert to list if single state
     state_names = [state] if isinstance(state, str) else state
@@ -80,7 +137,55 @@ def _get_parquet_paths(
             f"Available states: {', '.join(available)}"
         )
     
-    return parquet_paths
+    return tuple(parquet_paths)
+
+
+def _get_combined_schema(parquet_paths: list[Path]) -> Optional[pl.Schema]:
+    """
+    Get the schema to scan several parquet files with in one multi-file scan.
+    
+    Args:
+        parquet_paths: Parquet files to scan together
+        
+    Returns:
+        Combined schema of all files, or None if the files differ by more than
+        missing columns or numeric widths
+    """
+    mtimes = tuple(path.stat().st_mtime for path in parquet_paths)
+    return _get_combined_schema_cached(tuple(parquet_paths), mtimes)
+
+
+@functools.lru_cache(maxsize=64)
+def _get_combined_schema_cached(
+    parquet_paths: tuple[Path, ...],
+    mtimes: tuple[float, ...],
+) -> Optional[pl.Schema]:
+    """
+    Cached implementation of _get_combined_schema.
+    
+    Memoized on the paths and their modification times, so repeated loads
+    don't re-open every file to read its parquet footer, while rewritten
+    files are read again.
+    
+    Args:
+        parquet_paths: Parquet files to scan together
+        mtimes: Modification times of parquet_paths (only used as part of the cache key)
+        
+    Returns:
+        Combined schema of all files, or None if the files differ by more than
+        missing columns or numeric widths
+    """
+    schemas = [pl.read_parquet_schema(path) for path in parquet_paths]
+    combined_schema = pl.concat(
+        [pl.LazyFrame(schema=schema) for schema in schemas], how="diagonal_relaxed"
+    ).collect_schema()
+    
+    for schema in schemas:
+        for name, dtype in schema.items():
+            if dtype != combined_schema[name] and not (dtype.is_numeric() and combined_schema[name].is_numeric()):
+                return None
+    
+    return combined_schema
 
 
 def load_street_df(
@@ -142,14 +247,20 @@ def load_street_df(
     # Get list of parquet files to load
     parquet_paths = _get_parquet_paths(state, data_dir)
     
-    # Build lazy frame by scanning and concatenating all parquet files
-    lazy_frames = [pl.scan_parquet(path) for path in parquet_paths]
-    
-    # Concatenate all lazy frames
-    if len(lazy_frames) == 1:
-        lf = lazy_frames[0]
+    # Build lazy frame with one multi-file scan (parallel I/O, unified pushdown)
+    # over the files' combined schema, inserting missing columns and upcasting
+    # numeric widths (e.g. Int32 vs Int64 num_segments). Any other mismatch
+    # falls back to a diagonal_relaxed concat of per-file scans
+    combined_schema = _get_combined_schema(parquet_paths)
+    if combined_schema is not None:
+        lf = pl.scan_parquet(
+            parquet_paths,
+            schema=combined_schema,
+            missing_columns="insert",
+            cast_options=pl.ScanCastOptions(integer_cast=["upcast", "allow-float"], float_cast="upcast"),
+        )
     else:
-        lf = pl.concat(lazy_frames, how="diagonal_relaxed")
+        lf = pl.concat([pl.scan_parquet(path) for path in parquet_paths], how="diagonal_relaxed")
     
     # Apply highway type filter if specified
     if filter_to_types is not None:
@@ -198,20 +309,40 @@ def has_state_name_mask() -> pl.Expr:
         >>> # Or use directly in filter
         >>> state_streets = df.filter(has_state_name_mask())
     """
-    state_names = USState.all_names()
-    
-    # Create a case-insensitive check for each state name with word boundaries
-    # Start with False and OR together all state name matches
-    mask = pl.lit(False)
-    for state_name in state_names:
-        # Escape special regex characters in state name and wrap with word boundaries
-        # Use \b for word boundaries to match whole words only
-        escaped_name = state_name.replace("\\", "\\\\").replace(".", "\\.").replace("(", "\\(").replace(")", "\\)")
-        pattern = r"\b" + escaped_name + r"\b"
-        # Check if lowercase street_name contains the state name as a whole word
-        mask = mask | pl.col("street_name").str.to_lowercase().str.contains(pattern, literal=False)
-    
-    return mask
+    # Check if street_name contains any state name as a whole word: one
+    # combined regex instead of one per state, made case-insensitive with (?i)
+    # so the column doesn't have to be lowercased first
+    return pl.col("street_name").str.contains("(?i)" + STATE_NAME_PATTERN, literal=False)
+
+
+def first_state_name_expr(column: str = "street_name") -> pl.Expr:
+    """
+    Returns an expression giving the first state name (in USState order) found in a street name.
+
+    Matches plain substrings (no word boundaries), like the `state_name in street_lower`
+    loops used for coloring map markers. All state names are matched in a single
+    Aho-Corasick pass over the column instead of one Python substring check per state per row.
+
+    Args:
+        column: Name of the street name column
+
+    Returns:
+        polars Expr evaluating to the lowercase state name, or null if none is found
+
+    Examples:
+        >>> df = df.with_columns(first_state_name_expr().alias("found_state"))
+    """
+    return (
+        pl.col(column)
+        .str.to_lowercase()
+        .str.extract_many(list(STATE_NAMES), overlapping=True)
+        .list.eval(
+            pl.element().sort_by(
+                pl.element().replace_strict(STATE_NAME_ORDER, return_dtype=pl.UInt32)
+            )
+        )
+        .list.first()
+    )
 
 
 def load_state_streets_df(
@@ -274,13 +405,13 @@ def load_state_streets_df(
     # If caching is disabled, use the original implementation
     if not use_cache:
         lf = load_street_df(state=state, data_dir=data_dir, filter_to_types=filter_to_types)
-        mask = has_state_name_mask()
-        lf = lf.filter(mask)
         
+        # Cheap digit check first, so the state-name regex sees fewer rows
         if exclude_numbered:
-            lf = lf.filter(~pl.col("street_name").str.contains(r"\d", literal=False))
+            lf = lf.filter(~pl.col("street_name").str.contains(NUMBERED_STREET_PATTERN, literal=False))
         
-        return lf
+        mask = has_state_name_mask()
+        return lf.filter(mask)
     
     # Use caching
     cache = FileCache(cache_dir=DEFAULT_CACHE_DIR)
@@ -299,22 +430,24 @@ def load_state_streets_df(
     # Define the computation function
     def compute():
         lf = load_street_df(state=state, data_dir=data_dir, filter_to_types=filter_to_types)
-        mask = has_state_name_mask()
-        lf = lf.filter(mask)
         
+        # Cheap digit check first, so the state-name regex sees fewer rows
         if exclude_numbered:
-            lf = lf.filter(~pl.col("street_name").str.contains(r"\d", literal=False))
+            lf = lf.filter(~pl.col("street_name").str.contains(NUMBERED_STREET_PATTERN, literal=False))
+        
+        mask = has_state_name_mask()
+        lf = lf.filter(mask)
         
-        # Collect to DataFrame for caching
-        return lf.collect()
+        # Collect to DataFrame for caching; the streaming engine filters the
+        # nationwide scan batch by batch instead of materializing it first
+        return lf.collect(engine="streaming")
     
-    # Get or compute the result
-    df = cache.get_or_compute(
+    # Get or compute the result as a scan over the cache file, so
+    # downstream filters and column selections are pushed into the read
+    return cache.get_or_compute(
         key="state_streets",
         params=params,
         dependencies=dependencies,
         compute_fn=compute,
-    )
-    
-    # Return as LazyFrame for consistency with the API
-    return df.lazy()
\ No newline at end of file
+        lazy=True,
+    )
\ No newline at end of file
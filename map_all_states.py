@@ -6,10 +6,23 @@ from pathlib import Path
 from typing import Optional
 import polars as pl
 import folium
-from folium.plugins import MarkerCluster
-from workspace.states import USState
+from folium.plugins import FastMarkerCluster
 from workspace.state_colors import get_state_color
 from workspace.analyze_streets import load_state_data, filter_state_named_streets
+from workspace.load_street_df import first_state_name_expr, STATE_NAMES, STATE_NAME_ORDER
+
+# State map colors, computed once instead of per call / per row
+_STATE_COLOR = {state_name: get_state_color(state_name) for state_name in STATE_NAMES}
+
+# Leaflet callback FastMarkerCluster runs in the browser for each
+# [lat, lon, color, popup] row, matching folium's CircleMarker + Popup output
+_CIRCLE_MARKER_CALLBACK = """function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: %(radius)s, color: row[2], fill: true, fillColor: row[2], fillOpacity: %(fill_opacity)s
+    });
+    marker.bindPopup(row[3], {maxWidth: "100%%"});
+    return marker;
+}"""
 
 
 def load_all_states(data_dir: Path = None) -> pl.DataFrame:
@@ -24,17 +37,19 @@ def load_all_states(data_dir: Path = None) -> pl.DataFrame:
     missing_states = []
     
     print("Loading state data...")
-    for state in USState.all_names():
+    for state in STATE_NAMES:
         try:
             df = load_state_data(state, data_dir)
             # Select only common columns and cast to consistent types
+            # Low-cardinality string columns are dictionary-encoded so the
+            # per-state filters and group-bys compare integer codes, not strings
             df = df.select([
                 pl.col('street_name'),
-                pl.col('state'),
+                pl.col('state').cast(pl.Categorical),
                 pl.col('lat'),
                 pl.col('lon'),
                 pl.col('num_segments').cast(pl.Int64),  # Ensure consistent type
-                pl.col('highway_type')
+                pl.col('highway_type').cast(pl.Categorical)
             ])
             all_dfs.append(df)
             print(f"  ✓ {state.title()}: {len(df):,} streets")
@@ -45,27 +60,39 @@ def load_all_states(data_dir: Path = None) -> pl.DataFrame:
     if missing_states:
         print(f"\nWarning: Missing data for {len(missing_states)} states: {', '.join(missing_states)}")
     
-    combined = pl.concat(all_dfs)
+    # Keep the per-state chunks as-is instead of copying them into one
+    # contiguous allocation (roughly halves peak memory for the combined frame)
+    combined = pl.concat(all_dfs, rechunk=False)
     print(f"\nTotal streets across all states: {len(combined):,}")
     return combined
 
 
 def analyze_state_name_popularity(df: pl.DataFrame, output_dir: Path = None) -> pl.DataFrame:
     """Analyze which state names appear most frequently in street names across all states."""
-    state_names = USState.all_names()
-    
-    results = []
-    for state_name in state_names:
-        # Count streets containing this state name
-        count = len(df.filter(pl.col('street_name').str.to_lowercase().str.contains(state_name)))
-        
-        if count > 0:
-            results.append({
-                'state_name': state_name,
-                'street_count': count,
-            })
-    
-    result_df = pl.DataFrame(results).sort('street_count', descending=True)
+    # Lowercase once and find every state name in each street in a single
+    # Aho-Corasick pass (overlapping, so e.g. "arkansas" also counts "kansas"),
+    # then count streets per state name
+    result_df = (
+        df.lazy()
+        .select(
+            pl.col('street_name')
+            .str.to_lowercase()
+            .str.extract_many(list(STATE_NAMES), overlapping=True)
+            .list.unique()  # Count each street once per state name
+            .alias('state_name')
+        )
+        .explode('state_name')
+        .drop_nulls('state_name')
+        .group_by('state_name')
+        .agg(pl.len().cast(pl.Int64).alias('street_count'))
+        # Ties keep USState order
+        .sort(
+            'street_count',
+            pl.col('state_name').replace_strict(STATE_NAME_ORDER),
+            descending=[True, False],
+        )
+        .collect()
+    )
     
     print("\n" + "="*70)
     print("STATE NAME POPULARITY IN STREET NAMES")
@@ -82,48 +109,41 @@ def analyze_state_name_popularity(df: pl.DataFrame, output_dir: Path = None) ->
 
 def analyze_state_ego_vs_humility(df: pl.DataFrame, output_dir: Path = None) -> pl.DataFrame:
     """Analyze how often each state names streets after itself vs other states."""
-    state_names = USState.all_names()
-    
-    results = []
-    for state in state_names:
-        # Get all streets in this state
-        state_df = df.filter(pl.col('state') == state)
-        
-        if len(state_df) == 0:
-            continue
-        
-        # Count streets named after this state (in this state)
-        self_named = len(state_df.filter(
-            pl.col('street_name').str.to_lowercase().str.contains(state)
-        ))
-        
-        # Count streets named after OTHER states (in this state)
-        other_state_count = 0
-        for other_state in state_names:
-            if other_state != state:
-                count = len(state_df.filter(
-                    pl.col('street_name').str.to_lowercase().str.contains(other_state)
-                ))
-                other_state_count += count
-        
-        total_streets = len(state_df)
-        self_pct = (self_named / total_streets * 100) if total_streets > 0 else 0
-        other_pct = (other_state_count / total_streets * 100) if total_streets > 0 else 0
-        
-        # Ego score: ratio of self-named to other-named
-        ego_score = self_named / other_state_count if other_state_count > 0 else float('inf')
-        
-        results.append({
-            'state': state,
-            'total_streets': total_streets,
-            'self_named_streets': self_named,
-            'other_state_streets': other_state_count,
-            'self_pct': self_pct,
-            'other_pct': other_pct,
-            'ego_score': ego_score if ego_score != float('inf') else 999.0,
-        })
-    
-    result_df = pl.DataFrame(results).sort('ego_score', descending=True)
+    # One lowercase + Aho-Corasick pass finds the set of state names in each
+    # street; a street counts as self-named if its own state is in that set,
+    # and once towards other_state_streets for every other state name in it
+    hits = pl.col('street_name').str.to_lowercase().str.extract_many(
+        list(STATE_NAMES), overlapping=True
+    ).list.unique()
+    is_self_named = hits.list.contains(pl.col('state'))
+    
+    result_df = (
+        df.lazy()
+        .with_columns(pl.col('state').cast(pl.String))
+        .filter(pl.col('state').is_in(STATE_NAMES))
+        .group_by('state')
+        .agg(
+            pl.len().cast(pl.Int64).alias('total_streets'),
+            is_self_named.sum().cast(pl.Int64).alias('self_named_streets'),
+            (hits.list.len() - is_self_named.cast(pl.UInt32)).sum().cast(pl.Int64).alias('other_state_streets'),
+        )
+        .with_columns(
+            (pl.col('self_named_streets') / pl.col('total_streets') * 100).alias('self_pct'),
+            (pl.col('other_state_streets') / pl.col('total_streets') * 100).alias('other_pct'),
+            # Ego score: ratio of self-named to other-named
+            pl.when(pl.col('other_state_streets') > 0)
+            .then(pl.col('self_named_streets') / pl.col('other_state_streets'))
+            .otherwise(999.0)
+            .alias('ego_score'),
+        )
+        # Ties keep USState order
+        .sort(
+            'ego_score',
+            pl.col('state').replace_strict(STATE_NAME_ORDER),
+            descending=[True, False],
+        )
+        .collect()
+    )
     
     print("\n" + "="*70)
     print("STATE EGO vs HUMILITY ANALYSIS")
@@ -180,6 +200,101 @@ def analyze_highway_type_distribution(df: pl.DataFrame, output_dir: Path = None)
     return highway_type_counts
 
 
+def _add_circle_markers(
+    m: folium.Map,
+    df: pl.DataFrame,
+    radius: int,
+    fill_opacity: float,
+    cluster: bool = False,
+):
+    """
+    Add one filled circle marker per row to a map.
+    
+    Much faster than adding a folium.CircleMarker element per row, since folium
+    only builds and serializes one layer instead of one element per street.
+    Unclustered markers go in a single GeoJson layer. Clustered markers are
+    created in the browser by FastMarkerCluster, each with its own popup: the
+    cluster takes the points out of a GeoJson layer, so popups bound to the
+    layer would never open.
+    
+    Args:
+        m: Folium map to add the markers to
+        df: DataFrame with lat, lon, color (hex) and popup (HTML) columns
+        radius: Marker radius in pixels
+        fill_opacity: Marker fill opacity
+        cluster: If True, group the markers with marker clustering
+    """
+    if cluster:
+        FastMarkerCluster(
+            data=df.select(['lat', 'lon', 'color', 'popup']).rows(),
+            callback=_CIRCLE_MARKER_CALLBACK % {"radius": radius, "fill_opacity": fill_opacity},
+        ).add_to(m)
+        return
+    
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {"color": color, "popup": popup},
+        }
+        for lat, lon, color, popup in df.select(['lat', 'lon', 'color', 'popup']).iter_rows()
+    ]
+    
+    folium.GeoJson(
+        {"type": "FeatureCollection", "features": features},
+        marker=folium.CircleMarker(radius=radius, fill=True, fill_opacity=fill_opacity),
+        style_function=lambda feature: {
+            "color": feature["properties"]["color"],
+            "fillColor": feature["properties"]["color"],
+            "fillOpacity": fill_opacity,
+        },
+        popup=folium.GeoJsonPopup(fields=["popup"], labels=False),
+    ).add_to(m)
+
+
+def _sample_state_named_streets(df: pl.DataFrame, sample_size: int) -> pl.DataFrame:
+    """
+    Randomly sample state-named streets without filtering every street.
+    
+    Walks a random permutation of the rows in batches, filtering each street at
+    most once. The first batch of sample_size streets measures the hit rate,
+    and each later batch is sized from the hit rate so far to cover the
+    remaining matches. Since the permutation is random, the first sample_size
+    matches are a uniform random sample of all state-named streets.
+    
+    Args:
+        df: DataFrame with street data
+        sample_size: Number of state-named streets to sample
+        
+    Returns:
+        DataFrame with up to sample_size state-named streets (all of them if
+        there are fewer)
+    """
+    order = pl.int_range(0, len(df), eager=True).shuffle()
+    batches = []
+    num_scanned = 0
+    num_found = 0
+    batch_size = sample_size
+    
+    while num_found < sample_size and num_scanned < len(df):
+        batch = filter_state_named_streets(df[order.slice(num_scanned, batch_size)])
+        batches.append(batch)
+        num_scanned += batch_size
+        num_found += len(batch)
+        
+        # Size the next batch to find the remaining matches at the hit rate so
+        # far (with 10% headroom), or double the scan if nothing matched yet
+        if num_found > 0:
+            batch_size = int((sample_size - num_found) * num_scanned / num_found * 1.1) + 1
+        else:
+            batch_size = num_scanned
+    
+    sample = pl.concat(batches).head(sample_size)
+    print(f"Filtered {min(num_scanned, len(df)):,} randomly ordered streets to "
+          f"{len(sample):,} state-named streets")
+    return sample
+
+
 def create_national_map(
     df: pl.DataFrame,
     output_path: Path,
@@ -199,8 +314,12 @@ def create_national_map(
         tiles: Map tile style
     """
     if filter_state_names:
-        df = filter_state_named_streets(df)
-        print(f"Filtered to {len(df):,} state-named streets")
+        if sample_size and sample_size < len(df):
+            # Only filter as many random streets as it takes to find the sample
+            df = _sample_state_named_streets(df, sample_size)
+        else:
+            df = filter_state_named_streets(df)
+            print(f"Filtered to {len(df):,} state-named streets")
     
     if sample_size and len(df) > sample_size:
         df = df.sample(sample_size)
@@ -217,45 +336,23 @@ def create_national_map(
     # Create map
     m = folium.Map(location=[center_lat, center_lon], zoom_start=4, tiles=tiles)
     
-    # Use marker cluster if requested
-    if use_clusters:
-        marker_cluster = MarkerCluster().add_to(m)
-        target = marker_cluster
-    else:
-        target = m
+    # Color by the state name found in each street name (one vectorized pass
+    # instead of a Python substring loop per row); gray if there is none
+    df = df.with_columns(
+        first_state_name_expr()
+        .replace_strict(_STATE_COLOR, default='#7f7f7f', return_dtype=pl.String)
+        .alias('color'),
+        pl.format(
+            "{}<br>Location: {}<br>Highway type: {}",
+            pl.col('street_name').fill_null('None'),
+            pl.col('state').cast(pl.String).str.to_titlecase().fill_null('None'),
+            pl.col('highway_type').cast(pl.String).fill_null('None'),
+        ).alias('popup'),
+    )
     
-    # Add markers
+    # Add markers, clustered if requested
     print("Adding markers to map...")
-    for i, row in enumerate(df.iter_rows(named=True)):
-        if i % 10000 == 0 and i > 0:
-            print(f"  Added {i:,} markers...")
-        
-        # Find which state name is in this street name
-        street_lower = row['street_name'].lower()
-        found_state = None
-        for state_name in USState.all_names():
-            if state_name in street_lower:
-                found_state = state_name
-                break
-        
-        # Color by the state name found in the street name
-        highway_type = row.get('highway_type', 'N/A')
-        if found_state:
-            color = get_state_color(found_state)
-            popup_text = f"{row['street_name']}<br>Location: {row['state'].title()}<br>Highway type: {highway_type}"
-        else:
-            color = '#7f7f7f'  # Gray for streets without state names
-            popup_text = f"{row['street_name']}<br>Location: {row['state'].title()}<br>Highway type: {highway_type}"
-        
-        folium.CircleMarker(
-            location=[row['lat'], row['lon']],
-            radius=3,
-            popup=popup_text,
-            color=color,
-            fill=True,
-            fillColor=color,
-            fillOpacity=0.6
-        ).add_to(target)
+    _add_circle_markers(m, df, radius=3, fill_opacity=0.6, cluster=use_clusters)
     
     m.save(str(output_path))
     print(f"\nSaved national map to {output_path}")
@@ -284,30 +381,22 @@ def create_state_comparison_map(
     m = folium.Map(location=[center_lat, center_lon], zoom_start=7, tiles=tiles)
     
     # Add markers colored by which state name they contain
-    for row in state_named_df.iter_rows(named=True):
-        street_lower = row['street_name'].lower()
-        
-        # Find which state name is in this street
-        found_state = None
-        for other_state in USState.all_names():
-            if other_state in street_lower:
-                found_state = other_state
-                break
-        
-        if found_state:
-            color = get_state_color(found_state)
-            highway_type = row.get('highway_type', 'N/A')
-            popup_text = f"{row['street_name']}<br>Highway type: {highway_type}"
-            
-            folium.CircleMarker(
-                location=[row['lat'], row['lon']],
-                radius=4,
-                popup=popup_text,
-                color=color,
-                fill=True,
-                fillColor=color,
-                fillOpacity=0.7
-            ).add_to(m)
+    state_named_df = (
+        state_named_df
+        .with_columns(first_state_name_expr().alias('found_state'))
+        .filter(pl.col('found_state').is_not_null())
+        .with_columns(
+            pl.col('found_state')
+            .replace_strict(_STATE_COLOR, return_dtype=pl.String)
+            .alias('color'),
+            pl.format(
+                "{}<br>Highway type: {}",
+                pl.col('street_name').fill_null('None'),
+                pl.col('highway_type').cast(pl.String).fill_null('None'),
+            ).alias('popup'),
+        )
+    )
+    _add_circle_markers(m, state_named_df, radius=4, fill_opacity=0.7)
     
     m.save(str(output_path))
     print(f"Saved {state_name} comparison map to {output_path}")
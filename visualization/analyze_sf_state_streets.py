@@ -1,6 +1,8 @@
 """Analyze SF streets to find how many contain state names."""
 
+import functools
 import json
+import re
 from workspace.states import USState
 
 
@@ -11,21 +13,26 @@ def load_sf_streets(filepath):
     return data['streets']
 
 
+@functools.lru_cache(maxsize=None)
+def _state_name_patterns(state_names):
+    """Lowercase and compile a word-boundary pattern for each state name (once per tuple of names)."""
+    # Use word boundary matching to ensure complete word match
+    # This handles multi-word states like "new york" correctly
+    return tuple(
+        (state, re.compile(r'\b' + re.escape(state.lower()) + r'\b'))
+        for state in state_names
+    )
+
+
 def street_contains_state(street_name, state_names):
     """Check if a street name contains any state name as a complete word (case insensitive)."""
-    import re
-    
     street_lower = street_name.lower()
-    matching_states = []
-    
-    for state in state_names:
-        # Use word boundary matching to ensure complete word match
-        # This handles multi-word states like "new york" correctly
-        pattern = r'\b' + re.escape(state.lower()) + r'\b'
-        if re.search(pattern, street_lower):
-            matching_states.append(state)
     
-    return matching_states
+    return [
+        state
+        for state, pattern in _state_name_patterns(tuple(state_names))
+        if pattern.search(street_lower)
+    ]
 
 
 def analyze_state_streets(streets_data):
@@ -67,7 +74,7 @@ def analyze_state_streets(streets_data):
         if all_matching_states:
             streets_with_states.append({
                 'names': list(names_to_check),
-                'matching_states': sorted(list(all_matching_states)),
+                'matching_states': sorted(all_matching_states),
                 'miles': properties.get('miles', 0)
             })
             
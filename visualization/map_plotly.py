@@ -11,9 +11,8 @@ import json
 # Add workspace to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from load_street_df import load_state_streets_df
-from states import USState
-from state_colors import get_state_color
+from load_street_df import load_state_streets_df, first_state_name_expr
+from state_colors import STATE_COLORS
 
 
 def create_state_streets_map(
@@ -40,30 +39,21 @@ def create_state_streets_map(
     
     # Add a column for which state name is in the street name
     print("Identifying state names in street names...")
-    state_names = USState.all_names()
-    
-    def find_state_in_name(street_name: str) -> str:
-        """Find which state name appears in the street name."""
-        street_lower = street_name.lower()
-        for state_name in state_names:
-            if state_name in street_lower:
-                return state_name.title()
-        return "Unknown"
-    
-    # Add found_state column
+
+    # Add found_state column (one vectorized pass instead of a Python loop per row)
     df = df.with_columns([
-        pl.col("street_name").map_elements(find_state_in_name, return_dtype=pl.Utf8).alias("found_state")
+        first_state_name_expr()
+        .str.to_titlecase()
+        .fill_null("Unknown")
+        .alias("found_state")
     ])
     
-    # Add color column based on found state
-    def get_color_for_state(state_name: str) -> str:
-        """Get hex color for a state."""
-        if state_name == "Unknown":
-            return "#7f7f7f"
-        return get_state_color(state_name.lower())
-    
+    # Add color column based on found state ("Unknown" falls through to gray)
     df = df.with_columns([
-        pl.col("found_state").map_elements(get_color_for_state, return_dtype=pl.Utf8).alias("color")
+        pl.col("found_state")
+        .str.to_lowercase()
+        .replace_strict(STATE_COLORS, default="#7f7f7f", return_dtype=pl.Utf8)
+        .alias("color")
     ])
     
     # Create hover text
@@ -76,7 +66,7 @@ def create_state_streets_map(
     print("Creating Plotly map...")
     
     # Get unique states for filter list
-    unique_states = sorted(df["found_state"].unique().to_list())
+    unique_states = df["found_state"].unique().sort().to_list()
     
     # Create the figure using scattermapbox
     fig = go.Figure()